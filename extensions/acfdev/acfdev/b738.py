@@ -68,11 +68,13 @@ class B738(MCDUAircraft):
             page.append(line)
 
         def write_line_to_page(line, pos, text: str, color: COLORS, font_small: bool = False):
-            pos = pos * PAGE_BYTES_PER_CHAR
-            for c in range(len(text)):
-                page[line][pos + c * PAGE_BYTES_PER_CHAR] = color
-                page[line][pos + c * PAGE_BYTES_PER_CHAR + 1] = font_small
-                page[line][pos + c * PAGE_BYTES_PER_CHAR + PAGE_BYTES_PER_CHAR - 1] = text[c]
+            n = len(text)
+            start = pos * PAGE_BYTES_PER_CHAR
+            end = start + n * PAGE_BYTES_PER_CHAR
+            row = page[line]
+            row[start:end:PAGE_BYTES_PER_CHAR] = [color] * n
+            row[start + 1 : end : PAGE_BYTES_PER_CHAR] = [font_small] * n
+            row[start + PAGE_BYTES_PER_CHAR - 1 : end : PAGE_BYTES_PER_CHAR] = text
 
         def center_line(line: int, text: str, color: COLORS, font_small: bool = False):
             text = text[:PAGE_CHARS_PER_LINE]
@@ -24,7 +24,8 @@ logger = logging.getLogger(__name__)
 # logger.setLevel(logging.DEBUG)
 
 
-MCDU_DISPLAY_DATA = "sim/cockpit2/radios/indicators/fms_cdu(?P<unit>[1-2]+)_(?P<name>(text|style)+)_line(?P<line>[0-9]+)"
+MCDU_DISPLAY_DATA = re.compile(r"sim/cockpit2/radios/indicators/fms_cdu(?P<unit>[1-2]+)_(?P<name>(text|style)+)_line(?P<line>[0-9]+)")
+MCDU_UNIT = re.compile(r"fms_cdu[12]")
 
 
 class LaminarAirbus(MCDUAircraft):
@@ -36,6 +37,7 @@ class LaminarAirbus(MCDUAircraft):
     def __init__(self, author: str, icao: str, variant: str | None = None) -> None:
         MCDUAircraft.__init__(self, author=author, icao=icao, variant=variant)
         self._datarefs = {}
+        self._encodings = {}
 
     @property
     def mcdu_units(self) -> Set[int]:
@@ -45,25 +47,19 @@ class LaminarAirbus(MCDUAircraft):
 
     @staticmethod
     def is_display_dataref(dataref: str) -> bool:
-        return re.match(MCDU_DISPLAY_DATA, dataref) is not None
+        return MCDU_DISPLAY_DATA.match(dataref) is not None
 
     def get_mcdu_unit(self, dataref) -> int:
-        mcdu_unit = -1
-        try:
-            m = re.match(MCDU_DISPLAY_DATA, dataref)
-            if m is None:
-                logger.warning(f"not a display dataref {dataref}")
-                return -1
-            mcdu_unit = int(m["unit"])
-        except:
-            logger.warning(f"error invalid MCDU unit for {dataref}")
+        m = MCDU_DISPLAY_DATA.match(dataref)
+        if m is None:
+            logger.warning(f"not a display dataref {dataref}")
             return -1
-        return mcdu_unit
+        return int(m["unit"])  # unit group only matches digits
 
     def set_mcdu_unit(self, str_in: str, mcdu_unit: int):
         if mcdu_unit == 2:
-            return re.sub(r"fms_cdu[12]", "fms_cdu2", str_in)
-        return str_in if "fms_cdu1" in str_in else re.sub(r"fms_cdu[12]", "fms_cdu1", str_in)
+            return MCDU_UNIT.sub("fms_cdu2", str_in)
+        return str_in if "fms_cdu1" in str_in else MCDU_UNIT.sub("fms_cdu1", str_in)
 
     def variable_changed(self, dataref: str, value):
         self._datarefs[dataref] = value
@@ -74,14 +70,18 @@ class LaminarAirbus(MCDUAircraft):
         if "_text_line" in dataref.name:
             return value.decode("utf-8").replace("\u0000", "")
 
-        enc = chardet.detect(value)
-        if enc["confidence"] < 0.2:
-            logger.warning(f"cannot decode bytes for {dataref.name} ({enc})")
-            return value
+        encoding = self._encodings.get(dataref.name)
+        if encoding is None:  # detected once per dataref, only kept when detection is reliable
+            enc = chardet.detect(value)
+            if enc["confidence"] < 0.2:
+                logger.warning(f"cannot decode bytes for {dataref.name} ({enc})")
+                return value
+            encoding = enc["encoding"]
+            self._encodings[dataref.name] = encoding
         try:
-            return value.decode(enc["encoding"]).replace("\u0000", "")
+            return value.decode(encoding).replace("\u0000", "")
         except:
-            logger.warning(f"cannot decode bytes for {dataref} ({enc})", exc_info=True)
+            logger.warning(f"cannot decode bytes for {dataref} ({encoding})", exc_info=True)
         return value
 
     def show_page(self, mcdu_unit: int) -> list:
@@ -49,7 +49,9 @@ logger = logging.getLogger(__name__)
 # logger.setLevel(logging.DEBUG)
 
 
-MCDU_DISPLAY_DATA = r"AirbusFBW/MCDU(?P<unit>[1-3])(?P<name>(title|stitle|sp|label|cont|scont))(?P<line>[1-6]?)(?P<color>(Lw|Lg|[abgmswy]))"
+MCDU_DISPLAY_DATA = re.compile(r"AirbusFBW/MCDU(?P<unit>[1-3])(?P<name>(title|stitle|sp|label|cont|scont))(?P<line>[1-6]?)(?P<color>(Lw|Lg|[abgmswy]))")
+MCDU_VERTSLEW_DATA = re.compile(r"AirbusFBW/MCDU(?P<unit>[1-3])VertSlewKeys")
+MCDU_UNIT = re.compile(r"MCDU[123]")
 
 
 class ToLissAirbus(MCDUAircraft):
@@ -67,6 +69,10 @@ class ToLissAirbus(MCDUAircraft):
         self._datarefs = {}
         self.lines = {}
 
+        # Per dataref parsing results, static for the aircraft
+        self._mcdu_units = {}
+        self._display_lines = {}
+
     @property
     def mcdu_units(self) -> Set[int]:
         if not self.loaded:
@@ -77,28 +83,28 @@ class ToLissAirbus(MCDUAircraft):
     def is_display_dataref(dataref: str) -> bool:
         if "VertSlewKeys" in dataref:
             return True
-        return re.match(MCDU_DISPLAY_DATA, dataref) is not None
+        return MCDU_DISPLAY_DATA.match(dataref) is not None
 
     def get_mcdu_unit(self, dataref) -> int:
-        mcdu_unit = -1
+        mcdu_unit = self._mcdu_units.get(dataref)
+        if mcdu_unit is None:
+            mcdu_unit = self._parse_mcdu_unit(dataref)
+            self._mcdu_units[dataref] = mcdu_unit
+        return mcdu_unit
+
+    def _parse_mcdu_unit(self, dataref) -> int:
         if dataref == "AirbusFBW/DUBrightness[6]":  # MCDU screen brightness unit 1
             return 1
         elif dataref == "AirbusFBW/DUBrightness[7]":  # MCDU screen brightness unit 2
             return 2
-        try:
-            m = None
-            if "VertSlewKeys" in dataref:
-                m = re.match("AirbusFBW/MCDU(?P<unit>[1-3])VertSlewKeys", dataref)
-            else:
-                m = re.match(MCDU_DISPLAY_DATA, dataref)
-            if m is None:
-                logger.warning(f"not a display dataref {dataref}")
-                return -1
-            mcdu_unit = int(m["unit"])
-        except:
-            logger.warning(f"error invalid MCDU unit for {dataref}")
+        if "VertSlewKeys" in dataref:
+            m = MCDU_VERTSLEW_DATA.match(dataref)
+        else:
+            m = MCDU_DISPLAY_DATA.match(dataref)
+        if m is None:
+            logger.warning(f"not a display dataref {dataref}")
             return -1
-        return mcdu_unit
+        return int(m["unit"])  # unit group only matches a digit
 
     def set_mcdu_unit(self, str_in: str, mcdu_unit: int):
         if str_in.startswith("AirbusFBW/DUBrightness"):
@@ -107,10 +113,10 @@ class ToLissAirbus(MCDUAircraft):
             elif mcdu_unit == 2:
                 return "AirbusFBW/DUBrightness[7]"
         if mcdu_unit == 2:
-            return re.sub(r"MCDU[123]", "MCDU2", str_in)
+            return MCDU_UNIT.sub("MCDU2", str_in)
         elif mcdu_unit == 3:
-            return re.sub(r"MCDU[123]", "MCDU3", str_in)
-        return str_in if "MCDU1" in str_in else re.sub(r"MCDU[123]", "MCDU1", str_in)
+            return MCDU_UNIT.sub("MCDU3", str_in)
+        return str_in if "MCDU1" in str_in else MCDU_UNIT.sub("MCDU1", str_in)
 
     def clear_lines(self):
         self.lines = {}
@@ -123,22 +129,34 @@ class ToLissAirbus(MCDUAircraft):
             logger.warning(f"invalid MCDU unit {mcdu_unit} ({self.mcdu_units})")
             return
 
-        m = re.match(MCDU_DISPLAY_DATA, dataref)
-        if m is None:
+        display_line = self._display_line(dataref)
+        if display_line is None:
             logger.debug(f"not a display dataref {dataref}")
             return
 
-        colors = TOLISS_MCDU_LINE_COLOR_CODES
-        line = -1
-        what = m.group("name")
-        if what.endswith("title"):  # stitle, title
-            colors = "bgwys"
-        elif what == "sp":
-            colors = "aw"
-        else:  # label, scont, cont
-            line = int(m.group("line"))
+        what, line, colors = display_line
         self.update_line(mcdu_unit=mcdu_unit, line=line, what=what, colors=colors)
 
+    def _display_line(self, dataref: str) -> tuple | None:
+        """Returns (what, line, colors) of display dataref, None if not a display dataref"""
+        if dataref in self._display_lines:
+            return self._display_lines[dataref]
+        display_line = None
+        m = MCDU_DISPLAY_DATA.match(dataref)
+        if m is not None:
+            colors = TOLISS_MCDU_LINE_COLOR_CODES
+            line = -1
+            what = m.group("name")
+            if what.endswith("title"):  # stitle, title
+                colors = "bgwys"
+            elif what == "sp":
+                colors = "aw"
+            else:  # label, scont, cont
+                line = int(m.group("line"))
+            display_line = (what, line, colors)
+        self._display_lines[dataref] = display_line
+        return display_line
+
     def encode_bytes(self, dataref, value) -> str | bytes:
         try:
             return value.decode("ascii").replace("\u0000", "")
@@ -149,33 +167,26 @@ class ToLissAirbus(MCDUAircraft):
     def update_line(self, mcdu_unit: int, line: int, what: str, colors):
         """Line is 24 characters, 1 character is (<char>, <color>, <small>)."""
         line_str = "" if line == -1 else str(line)
+        # Color datarefs are looked up once per line: (value, color, size) for each color with a value
+        sources = []
+        size = 1 if what in ["stitle", "scont", "label"] else 0
+        for color in colors:
+            if what.endswith("cont") and color.startswith("L"):
+                continue
+            if size == 1 and color.startswith("L"):  # small becomes large
+                size = 0
+            v = self._datarefs.get(f"AirbusFBW/MCDU{mcdu_unit}{what}{line_str}{color}")
+            if v is None:
+                continue
+            if color.startswith("L") and len(color) == 2:  # maps Lg, Lw to g, w.
+                color = color[1]  # prevents "invalid color" further on
+            sources.append((v, COLORS_BY_MCDU_COLOR_KEY.get(color, color), size))
         this_line = []
         for c in range(24):
-            has_char = []
-            size = 1 if what in ["stitle", "scont", "label"] else 0
-            for color in colors:
-                if what.endswith("cont") and color.startswith("L"):
-                    continue
-                if size == 1 and color.startswith("L"):  # small becomes large
-                    size = 0
-                name = f"AirbusFBW/MCDU{mcdu_unit}{what}{line_str}{color}"
-                v = self._datarefs.get(name)
-                if v is None:
-                    # logger.debug(f"no value for dataref {name}")
-                    continue
-                if c < len(v):
-                    if v[c] != " ":
-                        if color.startswith("L") and len(color) == 2:  # maps Lg, Lw to g, w.
-                            color = color[1]  # prevents "invalid color" further on
-                        if color in COLORS_BY_MCDU_COLOR_KEY:
-                            has_char.append((v[c], COLORS_BY_MCDU_COLOR_KEY[color], size))
-                        else:
-                            has_char.append((v[c], color, size))
+            has_char = [(v[c], color, sz) for v, color, sz in sources if c < len(v) and v[c] != " "]
             if len(has_char) == 1:
-                this_line = this_line + has_char
+                this_line.append(has_char[0])
             else:
-                # if len(has_char) > 1:
-                #     logger.debug(f"mutiple char {what}, {c}: {has_char}")
                 this_line.append((" ", COLORS.WHITE, size))
         self.lines[f"AirbusFBW/MCDU{mcdu_unit}{what}{line_str}"] = this_line
 
@@ -184,7 +195,9 @@ class ToLissAirbus(MCDUAircraft):
         page = [[" " for _ in range(PAGE_BYTES_PER_LINE)] for _ in range(PAGE_LINES)]
 
         def combine(lr, sm):
-            return [sm[i] if lr[i][0] == " " else lr[i] for i in range(PAGE_CHARS_PER_LINE)]
+            if lr is None or sm is None:  # only one of large or small line received so far
+                return lr if sm is None else sm
+            return [s if lg[0] == " " else lg for lg, s in zip(lr, sm)]
 
         def show_line(line, lnum):
             if line is None:
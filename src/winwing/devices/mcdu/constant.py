@@ -40,7 +40,10 @@ class MCDU_BRIGHTNESS_NAME(Enum):
     SCREEN_BACKLIGHT = "LCDBacklight"
 
 
-SENSOR_CHECK_FREQUENCY = 40
+SENSOR_CHECK_FREQUENCY = 32  # power of two, in number of HID reads
+
+KEY_BITS = 12 * 8  # key state bits in HID input report, bytes 1 to 12
+KEY_DEBOUNCE_NS = 15_000_000  # key state changes closer than this to previous one are contact bounces
 
 BRIGHTNESS_AUTO_ADJUST = [  # set to False to suppress auto-adjust
     (1000, 0, 255, 255, "bright"),
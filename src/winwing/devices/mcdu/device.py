@@ -5,6 +5,7 @@ turn LED on or off.
 """
 
 import logging
+import queue
 import threading
 import time
 import importlib
@@ -23,16 +24,28 @@ from .constant import (
     PAGE_LINES,
     PAGE_CHARS_PER_LINE,
     PAGE_BYTES_PER_CHAR,
+    PAGE_BYTES_PER_LINE,
 )
 
 logger = logging.getLogger(__name__)
 # logger.setLevel(logging.DEBUG)
 
+# Reports turning each annunciator off, one report per LED, device has no report to set several LEDs
+LEDS_OFF_MESSAGES = tuple(bytes([0x02, 0x32, 0xBB, 0, 0, 3, 0x49, led.value, 0, 0, 0, 0, 0, 0]) for led in MCDU_ANNUNCIATORS)
+
+# Number of HID input reports read from device and waiting to be processed
+REPORT_QUEUE_SIZE = 16
+
 WINWING_MCDU_DEVICES = [
     {"vid": 0x4098, "pid": 0xBB36, "name": "MCDU - Captain", "mask": MCDU_DEVICE_MASKS.MCDU | MCDU_DEVICE_MASKS.CAP},  # MCDU, Captain side
     {"vid": 0x4098, "pid": 0xBB3E, "name": "MCDU - First Officer", "mask": MCDU_DEVICE_MASKS.MCDU | MCDU_DEVICE_MASKS.FO},  # MCDU, First officer side
     {"vid": 0x4098, "pid": 0xBB3A, "name": "MCDU - Observer", "mask": MCDU_DEVICE_MASKS.MCDU | MCDU_DEVICE_MASKS.OBS},  # MCDU, Observer
 ]
+MCDU_MASK_BY_VID_PID = {(d["vid"], d["pid"]): d["mask"] for d in WINWING_MCDU_DEVICES}
+
+# Display content is sent in frames of 64 bytes, 0xF2 followed by 63 bytes (=21 characters)
+DISPLAY_FRAME_HEADER = b"\xF2"
+DISPLAY_FRAME_PAYLOAD = 63
 
 
 class SPECIAL_CHARACTERS(IntEnum):
@@ -51,6 +64,44 @@ class SPECIAL_CHARACTERS(IntEnum):
     TEST = 9913
 
 
+# Replace special chars with UTF-8 bytes
+#   (UTF-16, UTF-8)
+# ° (00B0, 0xC2 0xB0)
+# ← (2190, 0xE2 0x86 0x90)
+# ↑ (2191, 0xE2 0x86 0x91)
+# → (2192, 0xE2 0x86 0x92)
+# ↓ (2193, 0xE2 0x86 0x93)
+# ☐ (2610, 0xE2 0x98 0x90
+# Δ (0394, 0xCE 0x94)
+# ⬡ (2B21, 0xE2 0xAC 0xA1)
+# ◀ (25C0, 0xE2 0x97 0x80)
+# ▶ (25B6, 0xE2 0x96 0xB6)
+SPECIAL_CHARACTERS_BYTES = {
+    chr(SPECIAL_CHARACTERS.DEGREE): b"\xC2\xB0",  # °
+    chr(SPECIAL_CHARACTERS.SQUARE): b"\xE2\x98\x90",  # ☐
+    chr(SPECIAL_CHARACTERS.ARROW_LEFT): b"\xE2\x86\x90",  # ←
+    chr(SPECIAL_CHARACTERS.ARROW_UP): b"\xE2\x86\x91",  # ↑
+    chr(SPECIAL_CHARACTERS.ARROW_RIGHT): b"\xE2\x86\x92",  # →
+    chr(SPECIAL_CHARACTERS.ARROW_DOWN): b"\xE2\x86\x93",  # ↓
+    chr(SPECIAL_CHARACTERS.HEXAGON): b"\xE2\xAC\xA1",  # ⬡
+    chr(SPECIAL_CHARACTERS.TRIANGLE_LEFT): b"\xE2\x97\x80",  # ◀
+    chr(SPECIAL_CHARACTERS.TRIANGLE_RIGHT): b"\xE2\x96\xB6",  # ▶
+    chr(SPECIAL_CHARACTERS.SQUARE_BRACKET_OPEN): b"[",
+    chr(SPECIAL_CHARACTERS.SQUARE_BRACKET_CLOSE): b"]",
+    chr(SPECIAL_CHARACTERS.DELTA): b"\xCE\x94",  # Δ
+    chr(SPECIAL_CHARACTERS.TEST): b"\xE2\x98\x89",  # sun
+}
+
+
+def _style_bytes(color: COLORS, font_small: bool) -> bytes:
+    color_mask = color.ww_mask + 0x016B if font_small else color.ww_mask
+    return bytes([color_mask & 0x0FF, (color_mask >> 8) & 0xFF])
+
+
+# Color/font low and high bytes for each (color, font_small)
+CHARACTER_STYLE_BYTES = {(c, font_small): _style_bytes(c, font_small) for c in COLORS for font_small in (False, True)}
+
+
 # Fonts:
 # Airbus1: B612
 # Airbus2: HoneywellMCDU
@@ -72,18 +123,22 @@ class MCDUDevice(HIDDevice):
         self.hardware_identifier = 0x32
         self.font = "b737"  # airbus1 b737
         ## Does not work with Airbus_2, Airbus_1 needs to load b737 before...
+        self._next_page = None
+        self._sending_page = False
+        self._page_lock = threading.Lock()
+        self._last_buffer = None  # last page buffer written to display
+        self._clears = 0  # number of clear(), a page written while display is cleared is not remembered
+        self._reports = queue.Queue(maxsize=REPORT_QUEUE_SIZE)  # input reports from reader to dispatcher thread
         HIDDevice.__init__(self, vendor_id=vendor_id, product_id=product_id)
         self.mcdu_unit = self.get_mcdu_mask()
 
     def get_mcdu_mask(self) -> int:
-        """Returns first device that matches Winwing' signature"""
-        mcdu_unit = MCDU_DEVICE_MASKS.NONE
-        for d in WINWING_MCDU_DEVICES:
-            if self.vendor_id == d["vid"] and self.product_id == d["pid"]:
-                mcdu_unit |= d["mask"]
-                logger.debug(f"MCDU unit {mcdu_unit}")
-                return mcdu_unit
-        logger.warning("MCDU unit not found")
+        """Returns mask of device that matches Winwing' signature"""
+        mcdu_unit = MCDU_MASK_BY_VID_PID.get((self.vendor_id, self.product_id))
+        if mcdu_unit is None:
+            logger.warning("MCDU unit not found")
+            return MCDU_DEVICE_MASKS.NONE
+        logger.debug(f"MCDU unit {mcdu_unit}")
         return mcdu_unit
 
     def init(self):
@@ -127,6 +182,10 @@ class MCDUDevice(HIDDevice):
         set_led_msg = [0x02, 0x32, 0xBB, 0, 0, 3, 0x49, led.value, 1 if on else 0, 0, 0, 0, 0, 0]
         self.device.write(bytes(set_led_msg))
 
+    def all_leds_off(self):
+        for message in LEDS_OFF_MESSAGES:
+            self.device.write(message)
+
     def set_font(self):
         if self.font is None:
             return
@@ -150,15 +209,54 @@ class MCDUDevice(HIDDevice):
         logger.debug(f"installed font {self.font} ({len(buffer)}b)")
 
     def _character_code(self, color: COLORS, font_small: bool = False) -> Tuple[int, int]:
-        color_mask = color.ww_mask + 0x016B if font_small else color.ww_mask
-        return (color_mask & 0x0FF, (color_mask >> 8) & 0xFF)
+        data_low, data_high = CHARACTER_STYLE_BYTES[(color, bool(font_small))]
+        return (data_low, data_high)
 
     def clear(self):
         blank_line = [0xF2] + [0x42, 0x00, ord(" ")] * PAGE_CHARS_PER_LINE
         for _ in range(16):
             self.device.write(bytes(blank_line))
+        with self._page_lock:
+            self._last_buffer = None
+            self._clears = self._clears + 1
 
     def display_page(self, page: list):
+        """Sends page to display.
+
+        If a page is being sent by another thread, this page is handed over to that thread
+        and the call returns immediately. Only the latest page is kept: pages superseded
+        before they could be sent are dropped without being encoded.
+        A page identical to the one on display is not sent again.
+
+        Args:
+            page (list): Page content, see encode_page()
+        """
+        with self._page_lock:
+            self._next_page = page
+            if self._sending_page:
+                return
+            self._sending_page = True
+        try:
+            while True:
+                with self._page_lock:
+                    page, self._next_page = self._next_page, None
+                    if page is None:
+                        self._sending_page = False
+                        return
+                    last_buffer, clears = self._last_buffer, self._clears
+                buffer = self.encode_page(page)
+                if buffer == last_buffer:
+                    continue
+                self.write_buffer(buffer=buffer)
+                with self._page_lock:
+                    if self._clears == clears:  # display not cleared while page was written
+                        self._last_buffer = buffer
+        except:
+            with self._page_lock:
+                self._sending_page = False
+            raise
+
+    def encode_page(self, page: list) -> list:
         """[summary]
 
         A Page is a list of Line.
@@ -167,94 +265,53 @@ class MCDUDevice(HIDDevice):
             2. color/font high byte
             3. ASCII code of char, modified for special characters
         All bytes are collected first in a big array.
-        Then array is sent by sets of 63 bytes (=21 characters) + one byte to set the type of message sent (.insert(0, 0xF2))
+        Then array is sent by sets of 63 bytes (=21 characters) + one byte to set the type of message sent (0xF2)
+
+        Color/font bytes are masked to a byte by construction. Characters that are neither
+        special nor single byte are not checked here, write_buffer() rejects the whole buffer.
 
         Args:
             page (list): [description]
+
+        Returns:
+            list: Bytes to send to display
         """
         # Encore a page into a single buffer of 3 byte set.
         buf = []
         for i in range(PAGE_LINES):
-            for j in range(PAGE_CHARS_PER_LINE):
+            line = page[i]
+            # Walk the line as three strided columns: colors, fonts, and characters
+            colors = line[0:PAGE_BYTES_PER_LINE:PAGE_BYTES_PER_CHAR]
+            fonts = line[1:PAGE_BYTES_PER_LINE:PAGE_BYTES_PER_CHAR]
+            chars = line[PAGE_BYTES_PER_CHAR - 1 : PAGE_BYTES_PER_LINE : PAGE_BYTES_PER_CHAR]
+            for color, font_small, char in zip(colors, fonts, chars):
                 # Style
-                color = page[i][j * PAGE_BYTES_PER_CHAR]
-                font_small = page[i][j * PAGE_BYTES_PER_CHAR + 1]
-                data_low, data_high = self._character_code(color, font_small)
-                if data_low > 255:
-                    logger.error(f"data_low: {page[i][j * PAGE_BYTES_PER_CHAR + PAGE_BYTES_PER_CHAR - 1]}, {color}, {font_small}, {i}, {j}")
-                if data_high > 255:
-                    logger.error(f"data_high: {page[i][j * PAGE_BYTES_PER_CHAR + PAGE_BYTES_PER_CHAR - 1]}, {color}, {font_small}, {i}, {j}")
-                buf.append(data_low)
-                buf.append(data_high)
-                # Character
-                val = ord(page[i][j * PAGE_BYTES_PER_CHAR + PAGE_BYTES_PER_CHAR - 1])
-
-                # Replace special chars with UTF-8 bytes
-                #   (UTF-16, UTF-8)
-                # ° (00B0, 0xC2 0xB0)
-                # ← (2190, 0xE2 0x86 0x90)
-                # ↑ (2191, 0xE2 0x86 0x91)
-                # → (2192, 0xE2 0x86 0x92)
-                # ↓ (2193, 0xE2 0x86 0x93)
-                # ☐ (2610, 0xE2 0x98 0x90
-                # Δ (0394, 0xCE 0x94)
-                # ⬡ (2B21, 0xE2 0xAC 0xA1)
-                # ◀ (25C0, 0xE2 0x97 0x80)
-                # ▶ (25B6, 0xE2 0x96 0xB6)
-                if val == SPECIAL_CHARACTERS.DEGREE.value:  # °
-                    buf.extend([0xC2, 0xB0])
-                elif val == SPECIAL_CHARACTERS.SQUARE.value:  # ☐
-                    buf.extend([0xE2, 0x98, 0x90])
-                elif val == SPECIAL_CHARACTERS.ARROW_LEFT.value:  # ←
-                    buf.extend([0xE2, 0x86, 0x90])
-                elif val == SPECIAL_CHARACTERS.ARROW_UP.value:  # ↑
-                    buf.extend([0xE2, 0x86, 0x91])
-                elif val == SPECIAL_CHARACTERS.ARROW_RIGHT.value:  # →
-                    buf.extend([0xE2, 0x86, 0x92])
-                elif val == SPECIAL_CHARACTERS.ARROW_DOWN.value:  # ↓
-                    buf.extend([0xE2, 0x86, 0x93])
-                elif val == SPECIAL_CHARACTERS.HEXAGON.value:  # ⬡
-                    buf.extend([0xE2, 0xAC, 0xA1])
-                elif val == SPECIAL_CHARACTERS.TRIANGLE_LEFT.value:  # ◀
-                    buf.extend([0xE2, 0x97, 0x80])
-                elif val == SPECIAL_CHARACTERS.TRIANGLE_RIGHT.value:  # ▶
-                    buf.extend([0xE2, 0x96, 0xB6])
-                elif val == SPECIAL_CHARACTERS.SQUARE_BRACKET_OPEN.value:  # ⬡
-                    buf.append(ord("["))
-                elif val == SPECIAL_CHARACTERS.SQUARE_BRACKET_CLOSE.value:  # ⬡
-                    buf.append(ord("]"))
-                elif val == SPECIAL_CHARACTERS.DELTA.value:  # ⬡
-                    buf.extend([0xCE, 0x94])
-                elif val == SPECIAL_CHARACTERS.TEST.value:  # ⬡
-                    buf.extend([0xE2, 0x98, 0x89])  # sun = [0xE2, 0x98, 0x89]
+                buf.extend(CHARACTER_STYLE_BYTES[(color, bool(font_small))])
+                # Character, special chars are replaced with their UTF-8 bytes
+                special = SPECIAL_CHARACTERS_BYTES.get(char)
+                if special is not None:
+                    buf.extend(special)
                 else:
-                    if val > 255:
-                        logger.error(f"character: {page[i][j * PAGE_BYTES_PER_CHAR + PAGE_BYTES_PER_CHAR - 1]}, {val}, {i}, {j}")
-                    buf.append(val)
+                    buf.append(ord(char))
 
-        self.write_buffer(buffer=buf)
+        return buf
 
     def write_buffer(self, buffer: bytes):
-        # check buffer first
-        pos = 0
-        for c in buffer:
-            if c > 255:
-                break
-            pos = pos + 1
-        if len(buffer) != pos:
-            logger.warning(f"invalid buffer, no display (pos={pos}/{len(buffer)}, {buffer[pos]})")
+        """Sends buffer to display in frames of one 0xF2 header byte and 63 bytes of payload.
+
+        Last frame is padded with zeros.
+        """
+        try:
+            buf = bytes(buffer)
+        except ValueError:
+            logger.warning(f"invalid buffer, no display ({len(buffer)} bytes)")
             return
 
-        buf = buffer
+        frames = -(-len(buf) // DISPLAY_FRAME_PAYLOAD)
+        buf = buf.ljust(frames * DISPLAY_FRAME_PAYLOAD, b"\x00")
         with self.busy_writing:
-            while len(buf) > 0:
-                max_len = min(63, len(buf))
-                msg_buf = buf[:max_len]
-                msg_buf.insert(0, 0xF2)
-                if max_len < 63:
-                    msg_buf.extend([0] * (63 - max_len))
-                self.device.write(bytes(msg_buf))
-                del buf[:max_len]
+            for start in range(0, len(buf), DISPLAY_FRAME_PAYLOAD):
+                self.device.write(DISPLAY_FRAME_HEADER + buf[start : start + DISPLAY_FRAME_PAYLOAD])
 
     def set_callback(self, callback):
         self.callback = callback
@@ -264,10 +321,15 @@ class MCDUDevice(HIDDevice):
             self.reader.clear()
             self.reader_thread = threading.Thread(target=self._reader_loop, name="MCDU Keystroke Reader")
             self.reader_thread.start()
+            self.dispatcher_thread = threading.Thread(target=self._dispatcher_loop, name="MCDU Keystroke Dispatcher")
+            self.dispatcher_thread.start()
 
     def stop(self):
         if not self.reader.is_set():
             self.reader.set()
+            self.reader_thread.join()
+            self._reports.put(None)  # stops dispatcher after pending reports
+            self.dispatcher_thread.join()
 
     def _reader_loop(self):
         while not self.reader.is_set():
@@ -284,7 +346,22 @@ class MCDUDevice(HIDDevice):
                 continue
             if self.callback is not None:
                 self._last_read = data_in
-                self.callback(data_in)
+                try:
+                    self._reports.put_nowait(data_in)  # processed in _dispatcher_loop(), reader keeps polling the device
+                except queue.Full:
+                    logger.warning("key dispatcher busy, input report dropped")
+
+    def _dispatcher_loop(self):
+        while True:
+            data_in = self._reports.get()
+            if data_in is None:
+                break
+            callback = self.callback
+            if callback is not None:
+                try:
+                    callback(data_in)
+                except:
+                    logger.warning("callback error", exc_info=True)
 
     def light_sensors(self):
         if len(self._last_read) > 20:
@@ -6,12 +6,15 @@ communication with simulator, dealing with different types of Airbus aircrafts..
 """
 
 from __future__ import annotations
-import io
 import logging
+import queue
+import struct
 import threading
 from typing import Dict, List
-from time import sleep
+from time import sleep, monotonic, monotonic_ns
 from datetime import datetime
+from itertools import cycle, islice
+from bisect import bisect_right
 import textwrap
 
 import chardet
@@ -32,6 +35,8 @@ from .constant import (
     MCDU_BRIGHTNESS,
     BRIGHTNESS_AUTO_ADJUST,
     SENSOR_CHECK_FREQUENCY,
+    KEY_BITS,
+    KEY_DEBOUNCE_NS,
     COLORS,
     MCDU_STATUS,
     PAGE_LINES,
@@ -44,10 +49,44 @@ logger = logging.getLogger(__name__)
 # logger.setLevel(logging.DEBUG)
 # When repetitive warnings, only show first ones:
 MAX_WARNING_COUNT = 3
+# Seconds, delay between first display dataref change and display refresh
+DISPLAY_UPDATE_DEBOUNCE = 0.020
+# Seconds, minimum delay between the start of two display refreshes
+DISPLAY_MIN_FRAME_INTERVAL = 0.030
 
 AUTHOR_REPORT = {"report-type": "simulator-value-change", "simulator-value-name": "sim/aircraft/view/acf_author", "action": "change-aircraft"}
 ICAO_REPORT = {"report-type": "simulator-value-change", "simulator-value-name": "sim/aircraft/view/acf_ICAO", "action": "change-aircraft"}
 ALWAYS_REPORTS = [ICAO_REPORT, AUTHOR_REPORT]
+DATA_VALUE_TYPE = DATAREF_DATATYPE.DATA.value
+
+# Left and right light sensor values, little endian 16 bits words starting at byte 17 of HID report
+SENSORS = struct.Struct("<HH")
+SENSORS_OFFSET = 17
+
+# BRIGHTNESS_AUTO_ADJUST levels in increasing sensor threshold order, for bisect
+BRIGHTNESS_LEVELS = sorted(BRIGHTNESS_AUTO_ADJUST, key=lambda r: r[0]) if BRIGHTNESS_AUTO_ADJUST else []
+BRIGHTNESS_THRESHOLDS = [r[0] for r in BRIGHTNESS_LEVELS]
+
+# Background color messages, indexed by color code 0..8
+BACKGROUND_HEADER = bytes([0xF0, 0x00, 0x0A, 0x12, 0x32, 0xBB, 0x00, 0x00, 0x04, 0x01, 0x00, 0x00, 0xD4, 0xAC, 0x09, 0x00])
+BACKGROUND_MESSAGES = tuple(BACKGROUND_HEADER + bytes([0x00, 0x01, 0x00, 0x00, 0x00, 0x0C + code]) + bytes(42) for code in range(9))
+
+# Blank page line, copied for each line of a cleared page
+BLANK_LINE = (COLORS.DEFAULT, False, " ") * PAGE_CHARS_PER_LINE
+
+# Test screen: all printable ASCII characters, then all special characters
+TEST_SCREEN_LINES = tuple(textwrap.wrap("".join([chr(c) for c in range(33, 127)]), 23)) + ("".join([chr(c.value) for c in SPECIAL_CHARACTERS]),)
+
+# Test screen page, line i shows TEST_SCREEN_LINES in color i
+TEST_SCREEN_PAGE = tuple(
+    tuple(x for ch in text for x in (color, False, ch)) + BLANK_LINE[len(text) * PAGE_BYTES_PER_CHAR :]
+    for text, color in zip(cycle(TEST_SCREEN_LINES), islice(cycle(COLORS), PAGE_LINES))
+)
+
+# Characters substituted for better rendering on terminal
+TERMINAL_CHARACTERS = str.maketrans({"#": "☐", "`": "°"})
+TERMINAL_COLOR_CHARACTERS = str.maketrans({"`": "°"})
+TERMINAL_COLOR_CODES = {c: c.term for c in COLORS}
 
 
 class MCDU(WinwingDevice):
@@ -73,13 +112,16 @@ class MCDU(WinwingDevice):
 
         self._extension_paths = []
         self.VALID_AIRCRAFTS = Aircraft.list()
+        self._valid_icaos = frozenset(a.split(":", 1)[0] for a in self.VALID_AIRCRAFTS)
 
         self.aircraft = None
         self.aircraft_config = None
         self._datarefs = {}
         self._loaded_datarefs = set()
+        self._monitored = set()
+        self._encodings = {}
 
-        self.display_datarefs = []
+        self.display_datarefs = set()
         self.mcdu_units = set()
 
         self.author = ""
@@ -92,7 +134,9 @@ class MCDU(WinwingDevice):
 
         self.device_reports = []
         self._device_reports_by_id = {}
-        self.simulator_reports = [MCDUSimulatorReport.new(config=s, device=self) for s in ALWAYS_REPORTS]
+        self._device_reports_mask = 0
+        self._always_reports = [MCDUSimulatorReport.new(config=s, device=self) for s in ALWAYS_REPORTS]  # created once, reused for all aircrafts
+        self.simulator_reports = list(self._always_reports)
         self._simulator_reports_by_id = {s.key: s for s in self.simulator_reports}
 
         self.display = MCDUDisplay(device=self.device)
@@ -101,11 +145,22 @@ class MCDU(WinwingDevice):
 
         # Working variables
         self._warned = False
-        self._buttons_press_event = [0] * len(self.device_reports)
-        self._buttons_release_event = [0] * len(self.device_reports)
         self._last_large_button_mask = 0
+        self._key_changes = [0] * KEY_BITS  # time of last accepted state change of each key bit, in ns
+        self._large_button_mask = 0  # key bits of last report
+        self._keys_lock = threading.Lock()  # key checks come from reader and from debounce timer
+        self._debounce_timer = None
         self._sensor_delta = 200
         self._reads = 0
+        self._sensor_mask = SENSOR_CHECK_FREQUENCY - 1  # check sensors every SENSOR_CHECK_FREQUENCY reads
+        self._brightness_level = -1  # index in BRIGHTNESS_LEVELS of auto adjusted brightness
+
+        # Readiness notifications, set from api callbacks, waited for in wait_for_*()
+        self._connected_evt = threading.Event()
+        self._aircraft_evt = threading.Event()
+        self._data_evt = threading.Event()
+        self._required_have = set()
+        self._required_lock = threading.Lock()  # guards _required_have and _data_evt, updated from api callbacks
         self.init()
 
     @property
@@ -131,6 +186,7 @@ class MCDU(WinwingDevice):
     def set_api(self, api):
         self.api = api
         self.api.add_callback(CALLBACK_TYPE.ON_DATAREF_UPDATE, self.on_dataref_update)
+        self.api.add_callback(CALLBACK_TYPE.ON_OPEN, self.on_connection)
         self.api.add_callback(CALLBACK_TYPE.ON_CLOSE, self.on_lost_connection)
 
     def init(self):
@@ -143,9 +199,9 @@ class MCDU(WinwingDevice):
         sleep(2)
 
     def reset_buttons(self):
-        self._buttons_press_event = [0] * len(self.device_reports)
-        self._buttons_release_event = [0] * len(self.device_reports)
         self._last_large_button_mask = 0
+        self._large_button_mask = 0
+        self._key_changes = [0] * KEY_BITS
         self._ready = True
 
     def set_aircraft_configuration(self, filename):
@@ -154,6 +210,7 @@ class MCDU(WinwingDevice):
     def set_extension_paths(self, extension_paths: List[str]):
         self._extension_paths = extension_paths
         self.VALID_AIRCRAFTS = Aircraft.list(extension_paths=extension_paths)
+        self._valid_icaos = frozenset(a.split(":", 1)[0] for a in self.VALID_AIRCRAFTS)
 
     def aircraft_from_configuration_file(self):
         logger.debug("..loading aircraft from configuration file..")
@@ -185,26 +242,30 @@ class MCDU(WinwingDevice):
         # Load device and simulator reports
         self.device_reports = [MCDUDeviceReport.new(config=d, simulator=self.api) for d in self.aircraft.device_reports()]
         self._device_reports_by_id = {d.key: d for d in self.device_reports}
+        self._device_reports_mask = (1 << len(self.device_reports)) - 1  # buttons scanned in reader_callback()
 
         self.simulator_reports = [MCDUSimulatorReport.new(config=s, device=self) for s in self.aircraft.simulator_reports()]
-        self._simulator_reports_by_id = {s.key: s for s in self.simulator_reports}
-        # Add allways report datarefs
-        if ICAO_DATAREF not in self._simulator_reports_by_id:
-            self.simulator_reports.append(MCDUSimulatorReport.new(config=ICAO_REPORT, device=self))
-        if AUTHOR_DATAREF not in self._simulator_reports_by_id:
-            self.simulator_reports.append(MCDUSimulatorReport.new(config=AUTHOR_REPORT, device=self))
+        # Add allways report datarefs, unless aircraft already reports them
+        acf_report_keys = {s.key for s in self.simulator_reports}
+        self.simulator_reports.extend(s for s in self._always_reports if s.key not in acf_report_keys)
         self._simulator_reports_by_id = {s.key: s for s in self.simulator_reports}
 
         self.mcdu_units = self.aircraft.mcdu_units
 
         # Collects and registers datarefs in use
         drefs1 = self.aircraft.display_datarefs()
-        drefs2 = [d for d in self.aircraft.datarefs() if d not in drefs1]
+        drefs2 = set(self.aircraft.datarefs()) - set(drefs1)
         drefs_display = set([self.aircraft.set_mcdu_unit(str_in=d, mcdu_unit=self.device.mcdu_unit_id) for d in drefs1])
         drefs_no_display = set([self.aircraft.set_mcdu_unit(str_in=d, mcdu_unit=self.device.mcdu_unit_id) for d in drefs2])
         self.display_datarefs = set([strip_index(d) for d in drefs_display])
         self._loaded_datarefs = drefs_display | drefs_no_display
         self.register_datarefs(paths=self._loaded_datarefs)
+        # Required datarefs that already have a value, further ones are added in on_dataref_update()
+        with self._required_lock:
+            self._data_evt.clear()
+            self._required_have = {d.path for d in self._datarefs.values() if d.path in self.display_datarefs and d.value is not None}
+            if len(self._required_have) >= len(self.display_datarefs):
+                self._data_evt.set()
         logger.debug(f"registered {len(self._loaded_datarefs)} datarefs for MCDU {self.device.mcdu_unit_id}, {len(self.display_datarefs)} required")
         self.display.set_display_datarefs(dataref_list=self.display_datarefs, mcdu_units=self.mcdu_units)
         logger.debug(f"loaded aircraft {self.icao}")
@@ -216,9 +277,14 @@ class MCDU(WinwingDevice):
         self.unload_datarefs()
         self.device_reports = []
         self._device_reports_by_id = {}
-        self.simulator_reports = [MCDUSimulatorReport.new(config=s, device=self) for s in ALWAYS_REPORTS]
+        self._device_reports_mask = 0
+        self.simulator_reports = list(self._always_reports)
         self._simulator_reports_by_id = {s.key: s for s in self.simulator_reports}
         self.mcdu_units = []
+        self.display_datarefs = set()
+        with self._required_lock:
+            self._required_have = set()
+            self._data_evt.clear()
         self.aircraft = None
         logger.debug(f"..unloaded aircraft {self.icao}")
 
@@ -229,7 +295,7 @@ class MCDU(WinwingDevice):
         """Returns the value of a single dataref"""
         d = self._datarefs.get(path)
         value = d.value if d is not None else None
-        if type(value) is bytes and d.value_type == DATAREF_DATATYPE.DATA.value:
+        if isinstance(value, bytes) and d.value_type == DATA_VALUE_TYPE:
             try:
                 value = value.decode(encoding=encoding).replace("\u0000", "")
             except:
@@ -237,15 +303,32 @@ class MCDU(WinwingDevice):
         return value
 
     def register_datarefs(self, paths: List[str]):
-        self._datarefs = self._datarefs | {p: Dataref(api=self.api, path=p) for p in paths if p not in self._datarefs}
-        self.api.monitor_datarefs(datarefs=self._datarefs, reason=f"Winwing MCDU register {self.icao}")
+        for p in paths:
+            if p not in self._datarefs:
+                self._datarefs[p] = Dataref(api=self.api, path=p)
+        # Monitoring is counted by the api, only monitor datarefs once
+        new = {p: self._datarefs[p] for p in paths if p not in self._monitored}
+        if len(new) == 0:
+            return
+        self.api.monitor_datarefs(datarefs=new, reason=f"Winwing MCDU register {self.icao}")
+        self._monitored.update(p for p, d in new.items() if d.is_monitored)
 
     def unregister_datarefs(self, paths: List[str]):
-        # Ignore supplied list, unregister all registered datarefs
-        self.api.unmonitor_datarefs(datarefs=self._datarefs, reason=f"Winwing MCDU unregister {self.icao}")
+        # Aircraft datarefs remain monitored to detect aircraft changes, they are released in unregister_all_datarefs()
+        self._unmonitor(paths=[p for p in paths if p not in AIRCRAFT_DATAREFS], reason=f"Winwing MCDU unregister {self.icao}")
 
     def unregister_all_datarefs(self):
-        self.api.unmonitor_datarefs(datarefs=self._datarefs, reason="Winwing MCDU terminates")
+        self._unmonitor(paths=list(self._monitored), reason="Winwing MCDU terminates")
+
+    def _unmonitor(self, paths: List[str], reason: str):
+        datarefs = {p: self._datarefs[p] for p in paths if p in self._monitored}
+        if len(datarefs) == 0:
+            return
+        if not self.api.connected:  # api leaves monitoring counts unchanged, datarefs remain monitored
+            logger.debug(f"not connected, {len(datarefs)} datarefs remain monitored")
+            return
+        self.api.unmonitor_datarefs(datarefs=datarefs, reason=reason)
+        self._monitored.difference_update(datarefs)
 
     def run(self):
         logger.debug("starting..")
@@ -260,6 +343,9 @@ class MCDU(WinwingDevice):
         logger.debug("terminating..")
         # stop receiving actions from devices
         self.device.set_callback(None)
+        timer = self._debounce_timer
+        if timer is not None:
+            timer.cancel()
         # ask to stop sending dataref updates
         self.unregister_all_datarefs()
         # disconnect api
@@ -269,33 +355,62 @@ class MCDU(WinwingDevice):
         # clear screen
         self.device.clear()
         # turn off all annunciator
-        for a in MCDU_ANNUNCIATORS:
-            self.set_annunciator(annunciator=a, on=False)
+        self.device.all_leds_off()
         self.device.terminate()
         logger.debug("..terminated")
 
     def reader_callback(self, data_in):
-        def xor_bitmask(a, b, bitmask):
-            return (a & bitmask) != (b & bitmask)
-
         if not self._ready:
             # Some messages are sent upon initialisation, we ignore them
             return
-        large_button_mask = 0
-        for i in range(12):
-            large_button_mask |= data_in[i + 1] << (8 * i)
+        self.check_keys(int.from_bytes(data_in[1:13], "little"))
 
-        for i in range(len(self.device_reports)):
-            mask = 0x01 << i
-            if xor_bitmask(large_button_mask, self._last_large_button_mask, mask):
-                self.do_keypress(i, pressed=(large_button_mask & mask))
-        self._last_large_button_mask = large_button_mask
-
-        if self._reads % SENSOR_CHECK_FREQUENCY == 0:
+        if not self._reads & self._sensor_mask:
             self.do_sensors(data_in)
         self._reads = self._reads + 1
 
+    def check_keys(self, large_button_mask: int | None = None):
+        """Reports key state changes, called with the key bits of each report.
+
+        A change within KEY_DEBOUNCE_NS of the previous change of the same key is contact bounce.
+        It is deferred and checked again on next report, or after KEY_DEBOUNCE_NS since
+        the device may not send another report if keys do not change after a quick tap.
+        Called without argument by the debounce timer, with the key bits of the last report.
+        """
+        with self._keys_lock:
+            if large_button_mask is None:
+                self._debounce_timer = None
+                large_button_mask = self._large_button_mask
+            else:
+                self._large_button_mask = large_button_mask
+
+            # Only visit buttons whose state changed, lowest bit first
+            last_mask = self._last_large_button_mask
+            changed = (large_button_mask ^ last_mask) & self._device_reports_mask
+            now = monotonic_ns()
+            deferred = False
+            while changed:
+                lsb = changed & -changed
+                changed ^= lsb
+                key = lsb.bit_length() - 1
+                if now - self._key_changes[key] < KEY_DEBOUNCE_NS:
+                    deferred = True  # contact bounce, kept as changed and checked again later
+                    continue
+                self._key_changes[key] = now
+                last_mask ^= lsb
+                self.do_keypress(key, pressed=bool(large_button_mask & lsb))
+            self._last_large_button_mask = last_mask
+
+            if deferred and self._debounce_timer is None:
+                self._debounce_timer = threading.Timer(KEY_DEBOUNCE_NS / 1_000_000_000, self.check_keys)
+                self._debounce_timer.daemon = True
+                self._debounce_timer.start()
+
+    def on_connection(self):
+        self._connected_evt.set()
+
     def on_lost_connection(self):
+        self._connected_evt.clear()
         self.display.message("waiting for X-Plane...")
         self.api.disconnect()  # cleanup existing
         self.api.connect()  # restarts from no connection
@@ -314,7 +429,8 @@ class MCDU(WinwingDevice):
                     last_warning = " (last warning)" if warning_count == MAX_WARNING_COUNT else ""
                     logger.warning(f"waiting for X-Plane{last_warning}")
                 warning_count = warning_count + 1
-                sleep(2)
+                self._connected_evt.wait(timeout=2)
+                self._connected_evt.clear()
             logger.info("connected to X-Plane")
         self.set_annunciator(annunciator=MCDU_ANNUNCIATORS.FAIL, on=False)
         self.set_annunciator(annunciator=MCDU_ANNUNCIATORS.STATUS, on=True)
@@ -329,6 +445,7 @@ class MCDU(WinwingDevice):
             logger.info("aircraft from supplied configuration file")
             self.status = MCDU_STATUS.AIRCRAFT_DETECTED
             return
+        self._aircraft_evt.clear()
         self.register_datarefs(paths=AIRCRAFT_DATAREFS)
         if not self._ready:
             self.display.message("waiting for aircraft...")
@@ -342,7 +459,8 @@ class MCDU(WinwingDevice):
                     last_warning = " (last warning)" if warning_count == MAX_WARNING_COUNT else ""
                     logger.warning(f"waiting for valid aircraft (current {key} not in list {self.VALID_AIRCRAFTS.keys()}{last_warning}")
                 warning_count = warning_count + 1
-                sleep(2)
+                self._aircraft_evt.wait(timeout=2)
+                self._aircraft_evt.clear()  # values are read after clear, no update can be missed
                 icao = self.get_dataref_value(ICAO_DATAREF)
                 author = self.get_dataref_value(AUTHOR_DATAREF)
                 key = Aircraft.key(author=author, icao=icao)
@@ -371,11 +489,6 @@ class MCDU(WinwingDevice):
         Registers the aircraft datarefs and wait for all "required" datarefs to have a value.
         """
 
-        def data_count():
-            drefs = {d.path: d.value for d in self._datarefs.values()}
-            reqs = filter(lambda k: k in self.display_datarefs and drefs.get(k) is not None, drefs.keys())
-            return len(list(reqs))
-
         ## Wait for API dataref meta data in cache?
         self.wait_for_metadata()
         # logger.debug("registering datarefs..")
@@ -396,19 +509,14 @@ class MCDU(WinwingDevice):
         self.status = MCDU_STATUS.WAITING_FOR_DATA
         self.set_annunciator(annunciator=MCDU_ANNUNCIATORS.STATUS, on=False)
         self.set_unit_warning()
-        sleep(2)  # give a chance for data to arrive, 2.0 secs sufficient on medium computer
         expected = len(self.display_datarefs)
-        cnt = data_count()
         warning_count = 0
-        if cnt != expected:
-            self.status = MCDU_STATUS.WAITING_FOR_DATA
-            while cnt != expected:
-                if warning_count <= MAX_WARNING_COUNT or warning_count % 30 == 0:
-                    last_warning = " (last warning)" if warning_count == MAX_WARNING_COUNT else ""
-                    logger.warning(f"waiting for MCDU data ({cnt}/{expected}){last_warning}")
-                warning_count = warning_count + 1
-                sleep(2)
-                cnt = data_count()
+        # _data_evt is set by on_dataref_update() when the last required dataref receives a value
+        while not self._data_evt.wait(timeout=2):
+            if warning_count <= MAX_WARNING_COUNT or warning_count % 30 == 0:
+                last_warning = " (last warning)" if warning_count == MAX_WARNING_COUNT else ""
+                logger.warning(f"waiting for MCDU data ({len(self._required_have)}/{expected}){last_warning}")
+            warning_count = warning_count + 1
         logger.info(f"MCDU {expected} data received")
         self.set_unit_warning(on=False)
         self.set_annunciator(annunciator=MCDU_ANNUNCIATORS.RDY, on=True)
@@ -441,15 +549,29 @@ class MCDU(WinwingDevice):
             return
         d.value = value
 
-        if type(value) is bytes:  # this is a string, try to decode it
+        if dataref in AIRCRAFT_DATAREFS:
+            self._aircraft_evt.set()
+        elif value is not None and d.path in self.display_datarefs:
+            with self._required_lock:
+                if d.path not in self._required_have:
+                    self._required_have.add(d.path)
+                    if len(self._required_have) >= len(self.display_datarefs):
+                        self._data_evt.set()
+
+        if isinstance(value, bytes):  # this is a string, try to decode it
             if self.aircraft is not None:
                 value = self.aircraft.encode_bytes(dataref=d, value=value)
             else:
-                enc = chardet.detect(value)
-                if enc["confidence"] > 0.2:
-                    value = value.decode(enc["encoding"]).replace("\u0000", "")
-                else:
-                    logger.warning(f"cannot decode bytes for {dataref} ({enc})")
+                encoding = self._encodings.get(dataref)
+                if encoding is None:  # detected once per dataref, only kept when detection is reliable
+                    enc = chardet.detect(value)
+                    if enc["confidence"] > 0.2:
+                        encoding = enc["encoding"]
+                        self._encodings[dataref] = encoding
+                    else:
+                        logger.warning(f"cannot decode bytes for {dataref} ({enc})")
+                if encoding is not None:
+                    value = value.decode(encoding).replace("\u0000", "")
 
         report = self._simulator_reports_by_id.get(dataref)
         if report is None:
@@ -483,14 +605,13 @@ class MCDU(WinwingDevice):
         # 3. Register new unit datarefs and wait for data
         self.wait_for_data()
         logger.info(f"MCDU unit {self.device.mcdu_unit_id}")
-        self.display._updated.set()
+        self.display.request_update()
         return self.device.mcdu_unit_id
 
     def change_aircraft(self, new_author: str, new_icao: str) -> str:
         # To do:
-        valid_icao_aircrafts = [a[: a.index("::")] for a in self.VALID_AIRCRAFTS]
-        if new_icao not in valid_icao_aircrafts:
-            logger.warning(f"{new_icao} not in list {','.join(valid_icao_aircrafts)}")
+        if new_icao not in self._valid_icaos:
+            logger.warning(f"{new_icao} not in list {','.join(sorted(self._valid_icaos))}")
             logger.warning(f"aircraft discrepency MCDU aircraft {self.icao} vs X-Plane aircraft {new_icao}")
             return self.icao
 
@@ -520,36 +641,37 @@ class MCDU(WinwingDevice):
 
     def do_sensors(self, data_in):
         w = False
-        v = 256 * int(data_in[18]) + int(data_in[17])
-        dl = v - self.sensors["left"]
+        left, right = SENSORS.unpack_from(data_in, SENSORS_OFFSET)
+        dl = left - self.sensors["left"]
         if abs(dl) > self._sensor_delta:
             w = True
-            self.sensors["left"] = v
-        v = 256 * int(data_in[20]) + int(data_in[19])
-        dr = v - self.sensors["right"]
+            self.sensors["left"] = left
+        dr = right - self.sensors["right"]
         if abs(dr) > self._sensor_delta:
             w = True
-            self.sensors["right"] = v
+            self.sensors["right"] = right
         if w:
             logger.debug(f"sensors: left {self.sensors['left']} ({dl}), right {self.sensors['right']} ({dr})")
-
         if not BRIGHTNESS_AUTO_ADJUST:
             return
+        if self._brightness_level < 0:  # no level applied yet, small readings also select a level
+            self.sensors["left"] = left
+            self.sensors["right"] = right
+        elif not w:
+            return  # same sensor values, same brightness level
+
         # Auto adjust back light brightness
-        GLOBAL_BRIGHTNESS = "_global"
         avg = int((self.sensors["left"] + self.sensors["right"]) / 2)
-        maxlevel = 100000
-        for r in BRIGHTNESS_AUTO_ADJUST:
-            if maxlevel > avg >= r[0]:
-                if self.brightness.get(GLOBAL_BRIGHTNESS, "") != r[4]:
-                    self.device.set_brightness(backlight=MCDU_BRIGHTNESS.BACKLIGHT, brightness=r[1])
-                    self.device.set_brightness(backlight=MCDU_BRIGHTNESS.SCREEN_BACKLIGHT, brightness=r[2])
-                    self.device.set_brightness(backlight=MCDU_BRIGHTNESS.LEDS_BRIGHTNESS, brightness=r[3])
-                    logger.info(f"brightness auto adjust to {r[4]}")
-                    logger.debug(f"brightness auto adjust: {r[4]} ({avg}): keyboard: {r[1]}, LCD: {r[2]}, LEDS: {r[3]}")
-                    self.brightness[GLOBAL_BRIGHTNESS] = r[4]
-                    break
-            maxlevel = r[0]
+        idx = bisect_right(BRIGHTNESS_THRESHOLDS, avg) - 1  # highest level with threshold <= avg
+        if idx < 0 or idx == self._brightness_level:
+            return
+        r = BRIGHTNESS_LEVELS[idx]
+        self.device.set_brightness(backlight=MCDU_BRIGHTNESS.BACKLIGHT, brightness=r[1])
+        self.device.set_brightness(backlight=MCDU_BRIGHTNESS.SCREEN_BACKLIGHT, brightness=r[2])
+        self.device.set_brightness(backlight=MCDU_BRIGHTNESS.LEDS_BRIGHTNESS, brightness=r[3])
+        logger.info(f"brightness auto adjust to {r[4]}")
+        logger.debug(f"brightness auto adjust: {r[4]} ({avg}): keyboard: {r[1]}, LCD: {r[2]}, LEDS: {r[3]}")
+        self._brightness_level = idx
 
     def set_annunciator(self, annunciator: MCDU_ANNUNCIATORS, on: bool = True):
         self.device.set_led(led=annunciator, on=on)
@@ -579,29 +701,8 @@ class MCDUTerminal:
         Returns:
             str: characters ready to display, include newlines.
         """
-        output = io.StringIO()
-        print("\n", file=output)
-        print("|------ MCDU SCREEN -----|", file=output)
-        for i in range(PAGE_LINES):
-            print("|", end="", file=output)
-            for j in range(PAGE_CHARS_PER_LINE):
-                val = page[i][j * PAGE_BYTES_PER_CHAR + PAGE_BYTES_PER_CHAR - 1]
-                if val == "#":
-                    # val = "▯"
-                    val = "☐"
-                if val == "`":
-                    val = "°"
-                # if val == ">":
-                #     val = "🠊"
-                # if val == "<":
-                #     val = "🠈"
-                print(val, end="", file=output)
-            print("|", file=output)
-        print("|------------------------|", file=output)
-        print("", file=output)
-        contents = output.getvalue()
-        output.close()
-        return contents
+        screen = "\n".join(["|" + "".join(page[i][PAGE_BYTES_PER_CHAR - 1 : PAGE_BYTES_PER_LINE : PAGE_BYTES_PER_CHAR]) + "|" for i in range(PAGE_LINES)])
+        return "\n\n|------ MCDU SCREEN -----|\n" + screen.translate(TERMINAL_CHARACTERS) + "\n|------------------------|\n\n"
 
 
 class MCDUColorTerminal:
@@ -621,33 +722,20 @@ class MCDUColorTerminal:
         Returns:
             str: characters ready to display, include newlines.
         """
-        TERMINAL_COLOR_CODES = {c.key: c.term for c in COLORS}
-        print("\n")
+        output = ["\n\n"]
         for i in range(PAGE_LINES):
-            for j in range(PAGE_CHARS_PER_LINE):
-                curr = ""
-                c = page[i][j * PAGE_BYTES_PER_CHAR : (j + 1) * PAGE_BYTES_PER_CHAR]
-                # c[1] is bool small_font, ignored for terminal
-                if c[0] == "s":  # "special" characters (rev. eng.)
-                    if c[2] == chr(35):
-                        c[2] = "☐"
-                    elif c[2] == chr(60):
-                        c[2] = "←"
-                    elif c[2] == chr(62):
-                        c[2] = "→"
-                    elif c[2] == chr(91):
-                        c[2] = "["
-                    elif c[2] == chr(93):
-                        c[2] = "]"
-                if c[2] == "`":
-                    c[2] = "°"
-                if curr != c[0]:
-                    curr = c[0]
-                    print(TERMINAL_COLOR_CODES.get(c[0], "\033[38;5;231m"), end="")  # default to white
-                print(c[2], end="")
-            print("")
-        print("\033[0m")  # reset
-        print("\n")
+            colors = page[i][0:PAGE_BYTES_PER_LINE:PAGE_BYTES_PER_CHAR]
+            chars = page[i][PAGE_BYTES_PER_CHAR - 1 : PAGE_BYTES_PER_LINE : PAGE_BYTES_PER_CHAR]
+            curr = None
+            # small font is ignored for terminal, color code only emitted when color changes
+            for color, char in zip(colors, chars):
+                if curr != color:
+                    curr = color
+                    output.append(TERMINAL_COLOR_CODES.get(color, COLORS.DEFAULT.term))
+                output.append(char)
+            output.append("\n")
+        output.append("\033[0m\n\n\n")  # reset
+        print("".join(output).translate(TERMINAL_COLOR_CHARACTERS), end="")  # escape codes contain no substituted character
 
 
 class MCDUDisplay:
@@ -667,26 +755,35 @@ class MCDUDisplay:
         self.datarefs = {}
 
         self._all_ok = False
+        self._available = set()  # display datarefs that received a value
+        self._test_screen_timer = None
+        self._message_pages = {}
+        self._mcdu_unit_by_dataref = {}
         self._last_display = datetime.now()
-        self._updated = threading.Event()
+        self._update_requests = queue.SimpleQueue()  # True: refresh display, None: stop updater
         self.update_event = threading.Event()
+        # Pages are sent to device on their own thread, only the latest page waits to be sent
+        self._pages = queue.Queue(maxsize=1)
+        self.writer_thread = threading.Thread(target=self.write_pages, name="MCDU Screen Writer")
+        self.writer_thread.start()
+        # Writer is ready before pages are built
         self.update_thread = threading.Thread(target=self.update, name="MCDU Screen Updater")
         self.update_thread.start()
 
     def set_aircraft(self, aircraft: Aircraft):
         self.aircraft = aircraft
+        self._mcdu_unit_by_dataref = {}
 
     def set_display_datarefs(self, dataref_list: set, mcdu_units: set):
         self.display_datarefs = dataref_list
         self.mcdu_units = mcdu_units
+        self._available = self.display_datarefs.intersection(self.datarefs)
+        self._all_ok = False
+        if self.aircraft is not None:  # unit of other datarefs is resolved on first change
+            self._mcdu_unit_by_dataref = {d: self.aircraft.get_mcdu_unit(d) for d in self.display_datarefs}
 
     def clear_page(self):
-        self.page = []
-        for i in range(PAGE_LINES):
-            line = []
-            for j in range(PAGE_CHARS_PER_LINE):
-                line.extend([COLORS.DEFAULT, False, " "])
-            self.page.append(line)
+        self.page = [list(BLANK_LINE) for _ in range(PAGE_LINES)]
 
     def clear_lines(self):
         if self.aircraft is not None:
@@ -694,96 +791,53 @@ class MCDUDisplay:
         self._all_ok = False
 
     def message(self, message, extra: bool = False):
-        def center_line(line: int, text: str, color: COLORS, font_small: bool = False):
+        self.device.clear()
+        # Message pages never change, they are built once and copied afterwards
+        key = (message, extra)
+        if key not in self._message_pages:
+            self._build_message_page(message=message, extra=extra)
+            self._message_pages[key] = tuple(tuple(line) for line in self.page)
+        self.page = [list(line) for line in self._message_pages[key]]
+        self.device.display_page(page=self.page)
+        if extra:
+            sleep(1)
+
+    def _build_message_page(self, message, extra: bool = False):
+        def center_line(line: int, text: str, color: COLORS, font_small: bool = False) -> tuple:
             text = text[:PAGE_CHARS_PER_LINE]
-            startpos = int((PAGE_CHARS_PER_LINE - len(text)) / 2)
-            self.write_line_to_page(line, startpos, text, color, font_small)
+            startpos = (PAGE_CHARS_PER_LINE - len(text)) // 2
+            return (line, startpos, text, color, font_small)
 
-        self.device.clear()
         self.clear_page()
 
-        # Heading
+        # Heading and message
         title = "WINWING for X-Plane"
-        idx = title.index("G") + int((PAGE_CHARS_PER_LINE - len(title)) / 2)
-        center_line(0, title, COLORS.DEFAULT)
-        self.page[0][idx * PAGE_BYTES_PER_CHAR] = COLORS.RED
-
-        # Message
-        center_line(8, message, COLORS.AMBER)
+        lines = [center_line(0, title, COLORS.DEFAULT), center_line(8, message, COLORS.AMBER)]
 
         # Extra (version information)
         if extra:
-            center_line(1, f"VERSION {winwing.version}", COLORS.CYAN, True)
-            self.write_line_to_page(3, 0, " MCDU", COLORS.WHITE, True)
-            self.write_line_to_page(4, 0, f"{chr(SPECIAL_CHARACTERS.ARROW_LEFT)}{MCDU.VERSION}", COLORS.CYAN, False)
-            center_line(12, "github.com/devleaks", COLORS.DEFAULT, True)
+            lines = lines + [
+                center_line(1, f"VERSION {winwing.version}", COLORS.CYAN, True),
+                (3, 0, " MCDU", COLORS.WHITE, True),
+                (4, 0, f"{chr(SPECIAL_CHARACTERS.ARROW_LEFT)}{MCDU.VERSION}", COLORS.CYAN, False),
+                center_line(12, "github.com/devleaks", COLORS.DEFAULT, True),
+                center_line(13, "/pywinwing", COLORS.DEFAULT, True),
+            ]
+        self.write_lines_to_page(lines)
+
+        # Red letters
+        idx = title.index("G") + (PAGE_CHARS_PER_LINE - len(title)) // 2
+        self.page[0][idx * PAGE_BYTES_PER_CHAR] = COLORS.RED
+        if extra:
             title = "/pywinwing"
-            center_line(13, title, COLORS.DEFAULT, True)
-            idx = title.index("g") + int((PAGE_CHARS_PER_LINE - len(title)) / 2)
+            idx = title.index("g") + (PAGE_CHARS_PER_LINE - len(title)) // 2
             self.page[13][idx * PAGE_BYTES_PER_CHAR] = COLORS.RED
-        self.device.display_page(page=self.page)
-        if extra:
-            sleep(1)
 
     def set_background(self, code: int = 8):
         if code < 0 or code > 8:
             logger.warning(f"invalid background color code {code}")
             return
-        bi = 0x32
-        # fmt off
-        data = [0xF0, 0x00, 0x0A, 0x12, bi, 0xBB, 0x00, 0x00, 0x04, 0x01, 0x00, 0x00, 0xD4, 0xAC, 0x09, 0x00]
-        xtra = [
-            0x00,
-            0x01,
-            0x00,
-            0x00,
-            0x00,
-            (0x0C + code),
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-            0x00,
-        ]
-        # fmt on
-        self.device.write(bytes(data + xtra))
+        self.device.write(BACKGROUND_MESSAGES[code])
 
     def test_screen(self):
         self.device.clear()
@@ -793,93 +847,156 @@ class MCDUDisplay:
         # for i in range(9):
         #     self.set_background(i)
         #     sleep(1)
-        prnt = "".join([chr(c) for c in range(33, 127)])
-        lines = textwrap.wrap(prnt, 23)
-        lines.append("".join([chr(c.value) for c in SPECIAL_CHARACTERS]))
-        i = 0
-        for c in COLORS:
-            if i < 14:
-                self.write_line_to_page(i, 0, lines[i % len(lines)], c, False)
-                i = i + 1
-        for c in COLORS:
-            if i < 14:
-                self.write_line_to_page(i, 0, lines[i % len(lines)], c, False)
-                i = i + 1
+        self.page = [list(line) for line in TEST_SCREEN_PAGE]
         self.device.display_page(page=self.page)
-        sleep(10)
+        # Test screen stays on for 10 seconds without blocking caller
+        self._test_screen_timer = threading.Timer(10.0, self._end_test_screen)
+        self._test_screen_timer.start()
+
+    def _end_test_screen(self):
+        self._test_screen_timer = None
+        if self.aircraft is not None:  # otherwise test screen remains until next message
+            self.request_update()
 
     def write_line_to_page(self, line, pos, text: str, color: COLORS, font_small: bool = False):
-        if not (0 <= line <= PAGE_LINES):
-            logger.warning(f"line number out of range {line}, {text}")
-            return
-        if pos < 0 or pos + len(text) >= PAGE_CHARS_PER_LINE:
-            logger.warning(f"text line overflow {pos}, {len(text)}, {text}")
+        n = len(text)
+        if not (0 <= line < PAGE_LINES and 0 <= pos and pos + n <= PAGE_CHARS_PER_LINE):
+            logger.warning(f"text out of page: line {line}, position {pos}, length {n}, {text}")
             return
-        if len(text) > PAGE_CHARS_PER_LINE:
-            logger.warning(f"text too long for line {len(text)}, {text}")
-            return
-        # data_low, data_high = self._data_from_col_font(color, font_small)
-        pos = pos * PAGE_BYTES_PER_CHAR
-        for c in range(len(text)):
-            self.page[line][pos + c * PAGE_BYTES_PER_CHAR] = color
-            self.page[line][pos + c * PAGE_BYTES_PER_CHAR + 1] = font_small
-            self.page[line][pos + c * PAGE_BYTES_PER_CHAR + PAGE_BYTES_PER_CHAR - 1] = text[c]
+        # Each cell field is written for the whole text with one strided slice assignment
+        start = pos * PAGE_BYTES_PER_CHAR
+        end = start + n * PAGE_BYTES_PER_CHAR
+        row = self.page[line]
+        row[start:end:PAGE_BYTES_PER_CHAR] = [color] * n
+        row[start + 1 : end : PAGE_BYTES_PER_CHAR] = [font_small] * n
+        row[start + PAGE_BYTES_PER_CHAR - 1 : end : PAGE_BYTES_PER_CHAR] = text
+
+    def write_lines_to_page(self, lines: list) -> bool:
+        """Writes several lines to page, nothing is written if one line does not fit in page.
+
+        Args:
+            lines (list): List of (line, pos, text, color, font_small) tuples, see write_line_to_page()
+
+        Returns:
+            bool: True if lines were written
+        """
+        for line, pos, text, color, font_small in lines:
+            n = len(text)
+            if not (0 <= line < PAGE_LINES and 0 <= pos and pos + n <= PAGE_CHARS_PER_LINE):
+                logger.warning(f"text out of page: line {line}, position {pos}, length {n}, {text}, no line written")
+                return False
+        page = self.page
+        for line, pos, text, color, font_small in lines:
+            n = len(text)
+            start = pos * PAGE_BYTES_PER_CHAR
+            end = start + n * PAGE_BYTES_PER_CHAR
+            row = page[line]
+            row[start:end:PAGE_BYTES_PER_CHAR] = [color] * n
+            row[start + 1 : end : PAGE_BYTES_PER_CHAR] = [font_small] * n
+            row[start + PAGE_BYTES_PER_CHAR - 1 : end : PAGE_BYTES_PER_CHAR] = text
+        return True
 
     def display(self, page: list | None = None):
         self.device.display_page(page=self.page if page is None else page)
 
     def all_datarefs_available_count(self) -> bool:
-        avail_drefs = filter(lambda x: x in self.display_datarefs, self.datarefs)
-        return len(list(avail_drefs))
+        return len(self._available)
 
     def all_datarefs_available(self) -> bool:
-        return self.all_datarefs_available_count() == len(self.display_datarefs)
+        return len(self._available) >= len(self.display_datarefs)
 
     def variable_changed(self, dataref: str, value):
         self.datarefs[dataref] = value
+        if dataref in self.display_datarefs:
+            self._available.add(dataref)
 
-        if self.aircraft is None:
-            logger.warning("no aircraft")
+        if self.aircraft is None:  # datarefs are only registered once aircraft is loaded
+            logger.debug("no aircraft")
             return
 
         self.aircraft.variable_changed(dataref=dataref, value=value)
 
         # Processing completed
         # is this dataref related to the unit we are currently displaying?
-        if self.aircraft.get_mcdu_unit(dataref) != self.device.mcdu_unit_id:
+        mcdu_unit = self._mcdu_unit_by_dataref.get(dataref)
+        if mcdu_unit is None:
+            mcdu_unit = self.aircraft.get_mcdu_unit(dataref)
+            self._mcdu_unit_by_dataref[dataref] = mcdu_unit
+        if mcdu_unit != self.device.mcdu_unit_id:
             # logger.debug(f"{dataref} does not belong to unit on display ({mcdu_unit})")
             return
 
-        if not self.all_datarefs_available():
-            # if (len(self.display_datarefs) - self.all_datarefs_available_count()) < 4:
-            #     print("still missing", set(self.display_datarefs) - set(self.datarefs.keys()))
-            return
-
-        if not self._all_ok:
+        if not self._all_ok:  # once all available, they remain available
+            if not self.all_datarefs_available():
+                # if (len(self.display_datarefs) - self.all_datarefs_available_count()) < 4:
+                #     print("still missing", set(self.display_datarefs) - set(self.datarefs.keys()))
+                return
             logger.debug(f"all {len(self.display_datarefs)} required dataref available")
             self._all_ok = True
 
-        self._updated.set()
+        self.request_update()
+
+    def request_update(self):
+        self._update_requests.put_nowait(True)
 
     def update(self):
         """Queueing mechanism to prevent concurrent updates"""
         logger.debug("display updater started")
-        while not self.update_event.is_set():
-            if self._updated.wait(1):
-                self._updated.clear()  # we clear first since an update may come while we refresh the display
-                self.show_page()  # _laminar
+        last_refresh = 0.0
+        while self._update_requests.get():
+            # let a burst of dataref updates settle into a single refresh, and limit refresh rate
+            sleep(max(DISPLAY_UPDATE_DEBOUNCE, last_refresh + DISPLAY_MIN_FRAME_INTERVAL - monotonic()))
+            # all requests received so far are served by this refresh, requests received while we refresh are kept
+            if not self._drain_update_requests():
+                break
+            last_refresh = monotonic()
+            self.show_page()  # _laminar
         logger.debug("display updater terminated")
 
+    def _drain_update_requests(self) -> bool:
+        """Removes pending update requests, returns False if stop was requested"""
+        try:
+            while True:
+                if not self._update_requests.get_nowait():
+                    return False
+        except queue.Empty:
+            return True
+
+    def write_pages(self):
+        """Sends pages built by show_page() to device, decoupled from page building"""
+        logger.debug("display writer started")
+        while not self.update_event.is_set():
+            page = self._pages.get()
+            if page is None:  # sent by stop_update()
+                break
+            # display mcdu on winwing
+            self.device.display_page(page=page)
+            if self.terminal is not None:
+                self.terminal.display_page(page=page)
+        logger.debug("display writer terminated")
+
     def stop_update(self):
+        timer = self._test_screen_timer
+        if timer is not None:
+            timer.cancel()
         self.update_event.set()
+        self._update_requests.put_nowait(None)
+        self.update_thread.join()
+        # No more page produced, wake up writer
+        try:
+            self._pages.get_nowait()
+        except queue.Empty:
+            pass
+        self._pages.put_nowait(None)
+        self.writer_thread.join()  # no page written after stop
 
     def show_page(self):
         self.page = self.aircraft.show_page(mcdu_unit=self.device.mcdu_unit_id)
-
-        # display mcdu on winwing
-        self.device.display_page(page=self.page)
-        if self.terminal is not None:
-            self.terminal.display_page(page=self.page)
+        try:
+            self._pages.get_nowait()  # drop page not sent yet, superseded by this one
+        except queue.Empty:
+            pass
+        self._pages.put_nowait(self.page)
 
 
 # ##################
@@ -74,21 +74,18 @@ class RefreshDeviceDisplay(MCDUDeviceAction):
 
 class SetDeviceValue(MCDUDeviceAction):
 
+    # device-value-name -> (device backlight, name for logging)
+    BACKLIGHTS = {
+        MCDU_BRIGHTNESS_NAME.BACKLIGHT.value: (MCDU_BRIGHTNESS.BACKLIGHT, "backlight"),
+        MCDU_BRIGHTNESS_NAME.SCREEN_BACKLIGHT.value: (MCDU_BRIGHTNESS.SCREEN_BACKLIGHT, "screen backlight"),
+    }
+
     def __init__(self, name: str, config: dict, device) -> None:
         MCDUDeviceAction.__init__(self, name=name, config=config, device=device)
+        self._backlight = self.BACKLIGHTS.get(config.get("device-value-name"))
+        self._dataref = config.get("simulator-value-name")
 
     def execute(self, **kwargs):
-        def doit(v, name):
-            v100 = int(round(100 * (v + 1) / 256))
-            if name == MCDU_BRIGHTNESS_NAME.BACKLIGHT.value:
-                self.device.device.set_brightness(backlight=MCDU_BRIGHTNESS.BACKLIGHT, brightness=v)
-                logger.info(f"{self.name} set device backlight to {v100}%")
-            elif name == MCDU_BRIGHTNESS_NAME.SCREEN_BACKLIGHT.value:
-                self.device.device.set_brightness(backlight=MCDU_BRIGHTNESS.SCREEN_BACKLIGHT, brightness=v)
-                logger.info(f"{self.name} set device screen backlight to {v100}%")
-            else:
-                logger.warning(f"{self.name} not a device brightness variable name")
-
         value = kwargs.get("value")
         if value is None:
             logger.warning(f"{self.name}: value is none")
@@ -96,13 +93,15 @@ class SetDeviceValue(MCDUDeviceAction):
         if value <= 1:  # dataref is in [0..1], we need [0..255]
             value = int(value * 255)
         value = int(max(0, min(value, 255)))
-        varname = self.config.get("device-value-name")
-        # if varname is None...
-        dataref = self.config.get("simulator-value-name")
-        if self.device.brightness.get(dataref, -1) != value:
-            self.device.brightness[dataref] = value
-            doit(v=value, name=varname)
-        # else value not changed
+        if self.device.brightness.get(self._dataref, -1) == value:
+            return  # value not changed
+        self.device.brightness[self._dataref] = value
+        if self._backlight is None:
+            logger.warning(f"{self.name} not a device brightness variable name")
+            return
+        backlight, label = self._backlight
+        self.device.device.set_brightness(backlight=backlight, brightness=value)
+        logger.info(f"{self.name} set device {label} to {int(round(100 * (value + 1) / 256))}%")
 
 
 class SetDeviceLed(MCDUDeviceAction):
@@ -152,6 +151,16 @@ class MCDUSimulatorAction(SimulatorAction):
 
     def __init__(self, name: str, config: dict, simulator) -> None:
         SimulatorAction.__init__(self, name=name, config=config, simulator=simulator)
+        self._unit_paths = {}
+
+    def unit_path(self, mcdu) -> str:
+        """Action name adjusted for the MCDU unit in use, resolved once per unit"""
+        mcdu_unit = mcdu.device.mcdu_unit_id
+        path = self._unit_paths.get(mcdu_unit)
+        if path is None:
+            path = mcdu.aircraft.set_mcdu_unit(str_in=self.name, mcdu_unit=mcdu_unit)
+            self._unit_paths[mcdu_unit] = path
+        return path
 
     @staticmethod
     def new(config: dict, simulator):
@@ -186,14 +195,18 @@ class ExecuteSimulatorCommand(MCDUSimulatorAction):
 
     def __init__(self, name: str, config: dict, simulator) -> None:
         MCDUSimulatorAction.__init__(self, name=name, config=config, simulator=simulator)
+        self._commands = {}
 
     def execute(self, **kwargs):
         mcdu = kwargs.get("mcdu")
         if mcdu is None:
             logger.warning("no MCDU device")
             return
-        unit_dataref = mcdu.aircraft.set_mcdu_unit(str_in=self.name, mcdu_unit=mcdu.device.mcdu_unit_id)
-        c = Command(api=self.simulator, path=unit_dataref)
+        unit_dataref = self.unit_path(mcdu)
+        c = self._commands.get(unit_dataref)
+        if c is None:  # created once per unit command path
+            c = Command(api=self.simulator, path=unit_dataref)
+            self._commands[unit_dataref] = c
         c.execute()
         logger.debug(f"sent command {unit_dataref}")
 
@@ -208,7 +221,7 @@ class SetSimulatorValue(MCDUSimulatorAction):
         if mcdu is None:
             logger.warning("no MCDU device")
             return
-        unit_dataref = mcdu.aircraft.set_mcdu_unit(str_in=self.name, mcdu_unit=mcdu.device.mcdu_unit_id)
+        unit_dataref = self.unit_path(mcdu)
         value = mcdu.api.get_dataref_value(unit_dataref)
         if value is None:
             logger.debug(f"no value for {unit_dataref} ({value})")
@@ -0,0 +1,119 @@
+"""MCDU hardware driver tests, run without device."""
+
+import queue
+import threading
+
+import pytest
+
+pytest.importorskip("hid")
+
+from winwing.devices.mcdu.constant import COLORS, PAGE_CHARS_PER_LINE, PAGE_LINES  # noqa: E402
+from winwing.devices.mcdu.device import MCDUDevice, REPORT_QUEUE_SIZE  # noqa: E402
+
+
+class FakeHid:
+    def __init__(self):
+        self.writes = []
+        self.on_write = None
+
+    def write(self, message: bytes):
+        self.writes.append(bytes(message))
+        if self.on_write is not None:
+            on_write, self.on_write = self.on_write, None
+            on_write()
+
+    def read(self, size: int, timeout: int) -> bytes:
+        threading.Event().wait(timeout / 1000)
+        return b""
+
+    def close(self):
+        pass
+
+
+def new_device() -> MCDUDevice:
+    device = MCDUDevice.__new__(MCDUDevice)  # no hardware: only set what display and reader need
+    device.device = FakeHid()
+    device._next_page = None
+    device._sending_page = False
+    device._page_lock = threading.Lock()
+    device.busy_writing = threading.Lock()
+    device._last_buffer = None
+    device._clears = 0
+    device._reports = queue.Queue(maxsize=REPORT_QUEUE_SIZE)
+    device._last_read = b""
+    device.reader = threading.Event()
+    device.reader.set()
+    device.callback = None
+    return device
+
+
+def new_page() -> list:
+    return [[COLORS.GREEN, False, "A"] * PAGE_CHARS_PER_LINE for _ in range(PAGE_LINES)]
+
+
+def test_same_page_sent_once():
+    device = new_device()
+    device.display_page(new_page())
+    count = len(device.device.writes)
+    assert count > 0
+    device.display_page(new_page())
+    assert len(device.device.writes) == count
+
+
+def test_same_page_sent_again_after_clear():
+    device = new_device()
+    device.display_page(new_page())
+    device.clear()
+    count = len(device.device.writes)
+    device.display_page(new_page())
+    assert len(device.device.writes) > count
+
+
+def test_same_page_sent_again_after_clear_during_write():
+    device = new_device()
+    device.device.on_write = device.clear  # display cleared while page is being written
+    device.display_page(new_page())
+    count = len(device.device.writes)
+    device.display_page(new_page())
+    assert len(device.device.writes) > count
+
+
+def test_stop_terminates_reader_and_dispatcher():
+    device = new_device()
+    device.set_callback(lambda data_in: None)
+    device.start()
+    device.stop()
+    assert not device.reader_thread.is_alive()
+    assert not device.dispatcher_thread.is_alive()
+
+
+def test_dispatcher_survives_callback_error():
+    device = new_device()
+    received = []
+
+    def callback(data_in):
+        received.append(data_in)
+        if len(received) == 1:
+            raise ValueError("key handler error")
+
+    device.set_callback(callback)
+    device.start()
+    device._reports.put(b"1")
+    device._reports.put(b"2")
+    device.stop()
+    assert received == [b"1", b"2"]
+
+
+def test_reader_never_blocks_on_full_queue():
+    device = new_device()
+    device.device.read = lambda size, timeout: bytes(25)
+    release = threading.Event()
+    device.set_callback(lambda data_in: release.wait())  # stuck consumer, queue fills up
+    device.start()
+    threading.Event().wait(0.05)
+    device.reader.set()
+    device.reader_thread.join(timeout=1)
+    assert not device.reader_thread.is_alive()
+    release.set()
+    device._reports.put(None)
+    device.dispatcher_thread.join()
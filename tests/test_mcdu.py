@@ -0,0 +1,186 @@
+"""MCDU coordinator tests, run without device nor simulator."""
+
+import threading
+
+import pytest
+
+pytest.importorskip("hid")
+pytest.importorskip("xpwebapi")
+
+from winwing.devices.mcdu import mcdu as mcdu_module  # noqa: E402
+from winwing.devices.mcdu.constant import AIRCRAFT_DATAREFS, COLORS, MCDU_DEVICE_MASKS  # noqa: E402
+
+
+class FakeApi:
+    """Counts monitoring requests per dataref like xpwebapi does"""
+
+    def __init__(self):
+        self.counts = {}
+        self.connected = True
+
+    def monitor_datarefs(self, datarefs: dict, reason: str | None = None):
+        for path in datarefs:
+            self.counts[path] = self.counts.get(path, 0) + 1
+
+    def unmonitor_datarefs(self, datarefs: dict, reason: str | None = None):
+        if not self.connected:
+            return
+        for path in datarefs:
+            if self.counts.get(path, 0) > 0:
+                self.counts[path] = self.counts[path] - 1
+
+    def monitored(self) -> set:
+        return {p for p, c in self.counts.items() if c > 0}
+
+
+class FakeDataref:
+    def __init__(self, api, path: str):
+        self.api = api
+        self.path = path
+        self.value = None
+
+    @property
+    def is_monitored(self) -> bool:
+        return self.api.counts.get(self.path, 0) > 0
+
+
+class FakeDevice:
+    def __init__(self):
+        self.mcdu_unit = MCDU_DEVICE_MASKS.MCDU | MCDU_DEVICE_MASKS.CAP
+
+    @property
+    def mcdu_unit_id(self) -> int:
+        return 2 if self.mcdu_unit & MCDU_DEVICE_MASKS.FO else 1
+
+    def set_unit(self, unit):
+        self.mcdu_unit = MCDU_DEVICE_MASKS.MCDU | unit
+
+    def set_unit_led(self, on: bool = True):
+        pass
+
+
+class FakeDisplay:
+    def request_update(self):
+        pass
+
+
+def unit_datarefs(unit: int) -> set:
+    return {f"AirbusFBW/MCDU{unit}title{c}" for c in "bgw"}
+
+
+def test_aircraft_datarefs_monitored_after_unit_change(monkeypatch):
+    monkeypatch.setattr(mcdu_module, "Dataref", FakeDataref)
+    m = mcdu_module.MCDU.__new__(mcdu_module.MCDU)
+    m.api = FakeApi()
+    m.device = FakeDevice()
+    m.display = FakeDisplay()
+    m.icao = "A321"
+    m._datarefs = {}
+    m._monitored = set()
+
+    def load_unit_datarefs():  # what wait_for_data() does through load_aircraft()
+        m._loaded_datarefs = unit_datarefs(m.device.mcdu_unit_id)
+        m.register_datarefs(paths=m._loaded_datarefs)
+
+    monkeypatch.setattr(m, "wait_for_data", load_unit_datarefs)
+
+    m.register_datarefs(paths=AIRCRAFT_DATAREFS)  # wait_for_aircraft()
+    load_unit_datarefs()
+    assert m.change_mcdu_unit() == 2
+
+    assert m.api.monitored() == set(AIRCRAFT_DATAREFS) | unit_datarefs(2)
+
+    m.unregister_all_datarefs()
+    assert m.api.monitored() == set()
+
+
+def test_datarefs_remain_monitored_while_not_connected(monkeypatch):
+    monkeypatch.setattr(mcdu_module, "Dataref", FakeDataref)
+    m = mcdu_module.MCDU.__new__(mcdu_module.MCDU)
+    m.api = FakeApi()
+    m.icao = "A321"
+    m._datarefs = {}
+    m._monitored = set()
+    m.register_datarefs(paths=unit_datarefs(1))
+
+    m.api.connected = False
+    m.unregister_datarefs(paths=unit_datarefs(1))
+    assert m._monitored == m.api.monitored() == unit_datarefs(1)
+
+    m.api.connected = True
+    m.unregister_all_datarefs()
+    assert m._monitored == m.api.monitored() == set()
+
+
+def new_display():
+    display = mcdu_module.MCDUDisplay.__new__(mcdu_module.MCDUDisplay)  # no updater nor writer thread
+    display.clear_page()
+    return display
+
+
+def test_write_lines_same_as_line_by_line():
+    lines = [(0, 2, "HELLO", COLORS.GREEN, False), (5, 0, "WORLD", COLORS.AMBER, True), (13, 19, "BYE", COLORS.CYAN, False)]
+    expected = new_display()
+    for line in lines:
+        expected.write_line_to_page(*line)
+    display = new_display()
+    assert display.write_lines_to_page(lines)
+    assert display.page == expected.page
+
+
+def test_write_lines_out_of_page_writes_nothing():
+    display = new_display()
+    blank = [list(line) for line in display.page]
+    assert not display.write_lines_to_page([(0, 0, "HELLO", COLORS.GREEN, False), (1, 20, "TOO LONG", COLORS.GREEN, False)])
+    assert display.page == blank
+
+
+class FakeBrightnessDevice:
+    def __init__(self):
+        self.brightness = []
+
+    def set_brightness(self, backlight, brightness: int):
+        self.brightness.append((backlight, brightness))
+
+
+def sensor_report(left: int, right: int) -> bytes:
+    data_in = bytearray(25)
+    mcdu_module.SENSORS.pack_into(data_in, mcdu_module.SENSORS_OFFSET, left, right)
+    return bytes(data_in)
+
+
+def test_dim_room_brightness_applied_on_first_check():
+    m = mcdu_module.MCDU.__new__(mcdu_module.MCDU)
+    m.device = FakeBrightnessDevice()
+    m.sensors = {"left": 0, "right": 0}
+    m._sensor_delta = 200
+    m._brightness_level = -1
+
+    m.do_sensors(sensor_report(150, 150))  # dark, within sensor delta of initial values
+    assert len(m.device.brightness) == 3
+    assert mcdu_module.BRIGHTNESS_LEVELS[m._brightness_level][4] == "dark"
+
+    m.do_sensors(sensor_report(150, 150))  # level already applied
+    assert len(m.device.brightness) == 3
+
+
+def key_report(keys: list) -> bytes:
+    return bytes(1) + sum(1 << k for k in keys).to_bytes(12, "little") + bytes(12)
+
+
+def test_fast_tap_without_further_report_released():
+    m = mcdu_module.MCDU.__new__(mcdu_module.MCDU)
+    m._keys_lock = threading.Lock()
+    m._debounce_timer = None
+    m._device_reports_mask = (1 << mcdu_module.KEY_BITS) - 1
+    m._reads = 1
+    m._sensor_mask = 0xFF
+    m.reset_buttons()
+    events = []
+    m.do_keypress = lambda key, pressed: events.append((key, pressed))
+
+    m.reader_callback(key_report([3]))
+    m.reader_callback(key_report([]))  # released within debounce delay, no report afterwards
+    assert events == [(3, True)]
+    threading.Event().wait(mcdu_module.KEY_DEBOUNCE_NS / 1_000_000_000 * 4)
+    assert events == [(3, True), (3, False)]